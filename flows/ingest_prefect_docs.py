@@ -0,0 +1,209 @@
+import asyncio
+import re
+from itertools import chain
+
+import httpx
+from prefect import flow, task
+from raggy.documents import Document, document_to_excerpts
+from raggy.loaders.base import Loader
+from raggy.loaders.github import GitHubRepoLoader
+from raggy.loaders.web import SitemapLoader
+from raggy.utilities.embeddings import create_openai_embeddings
+from raggy.vectorstores.chroma import Chroma
+
+from slacky.logging import get_logger
+from slacky.settings import settings
+
+logger = get_logger(__name__)
+
+# bound loader fan-out so GitHub and the sitemap host aren't hammered
+LOADER_CONCURRENCY = 4
+
+# Chroma's add path degrades non-linearly with batch size; a few hundred
+# documents per call is the sweet spot, with a handful of batches in flight
+UPSERT_BATCH_SIZE = 256
+UPSERT_WORKERS = 4
+
+# OpenAI's embeddings endpoint accepts batched input; 64 texts per request
+# keeps payloads small enough to gather many requests concurrently
+EMBEDDING_BATCH_SIZE = 64
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern[str]:
+    """Translate a filesystem glob to a regex.
+
+    fnmatch lets ``*`` cross ``/`` and has no ``**``; here ``*`` and ``?``
+    stop at path separators while ``**`` spans directories, matching the
+    base loader's filesystem-glob semantics.
+    """
+    parts: list[str] = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "*":
+            if pattern[i : i + 3] == "**/":
+                parts.append(r"(?:[^/]+/)*")
+                i += 3
+            elif pattern[i : i + 2] == "**":
+                parts.append(r".*")
+                i += 2
+            else:
+                parts.append(r"[^/]*")
+                i += 1
+        elif pattern[i] == "?":
+            parts.append(r"[^/]")
+            i += 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(parts) + r"\Z")
+
+
+class ConcurrentGitHubRepoLoader(GitHubRepoLoader):
+    """GitHubRepoLoader that fetches matching files concurrently.
+
+    One git-tree API call lists every matching path, then file contents
+    come straight from raw.githubusercontent.com with a bounded fan-out
+    instead of one round trip per file through the REST API.
+    """
+
+    concurrency: int = 32
+
+    async def load(self) -> list[Document]:
+        # the inherited validator rewrites ``repo`` into a clone URL
+        # (https://github.com/<owner>/<repo>.git); recover the bare slug
+        # the REST and raw-content endpoints expect
+        repo = self.repo.removeprefix("https://github.com/").removesuffix(".git")
+        async with httpx.AsyncClient(http2=True) as client:
+            tree_response = await client.get(
+                f"https://api.github.com/repos/{repo}/git/trees/main",
+                params={"recursive": "1"},
+            )
+            tree_response.raise_for_status()
+            patterns = [_glob_to_regex(glob) for glob in self.include_globs]
+            paths = [
+                entry["path"]
+                for entry in tree_response.json()["tree"]
+                if entry["type"] == "blob"
+                and any(pattern.match(entry["path"]) for pattern in patterns)
+            ]
+            logger.info(f"Fetching {len(paths)} files from {repo}")
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(path: str) -> list[Document]:
+                async with semaphore:
+                    response = await client.get(
+                        f"https://raw.githubusercontent.com/{repo}/main/{path}"
+                    )
+                    response.raise_for_status()
+                # chunk into excerpts like the base loader, so retrieval
+                # granularity doesn't regress to whole files
+                return await document_to_excerpts(
+                    Document(
+                        text=response.text,
+                        metadata={
+                            "source": f"{repo}/{path}",
+                            "link": str(response.url),
+                        },
+                    )
+                )
+
+            return list(
+                chain.from_iterable(
+                    await asyncio.gather(*(fetch(path) for path in paths))
+                )
+            )
+
+
+prefect_loaders: list[Loader] = [
+    SitemapLoader(urls=["https://docs.prefect.io/sitemap.xml"]),
+    ConcurrentGitHubRepoLoader(
+        repo="prefecthq/prefect",
+        include_globs=["**/*.md", "src/prefect/*.py", "flows/*.py"],
+    ),
+]
+
+
+@task
+async def run_loader(loader: Loader) -> list[Document]:
+    """Run a loader and return its documents."""
+    return await loader.load()
+
+
+@task
+async def embed_documents(documents: list[Document]) -> list[list[float]]:
+    """Embed document text in parallel batches, outside of Chroma."""
+    texts = [document.text for document in documents]
+    batches = [
+        texts[i : i + EMBEDDING_BATCH_SIZE]
+        for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+    ]
+    results = await asyncio.gather(
+        *(create_openai_embeddings(batch) for batch in batches)
+    )
+    # create_openai_embeddings unwraps single-element inputs to one flat
+    # vector; re-wrap those so embeddings stay aligned with documents
+    embeddings: list[list[float]] = []
+    for batch, result in zip(batches, results):
+        embeddings.extend([result] if len(batch) == 1 else result)
+    return embeddings
+
+
+def _upsert_batch(
+    chroma: Chroma, documents: list[Document], embeddings: list[list[float]]
+) -> None:
+    """Upsert a batch with precomputed vectors so Chroma skips embedding."""
+    chroma.collection.upsert(
+        ids=[document.id for document in documents],
+        documents=[document.text for document in documents],
+        metadatas=[
+            document.metadata.model_dump(exclude_none=True) for document in documents
+        ],
+        embeddings=embeddings,
+    )
+
+
+@flow(name="refresh chroma", log_prints=True)
+async def refresh_chroma(collection_name: str = "slacky") -> None:
+    """Refresh the knowledgebase from the configured loaders.
+
+    Loaders are network-bound, so they run concurrently (bounded by a
+    semaphore). Each loader's documents are embedded and upserted in
+    batches as soon as that loader finishes, with up to UPSERT_WORKERS
+    upserts in flight, so the full corpus is never held in memory.
+    """
+    semaphore = asyncio.Semaphore(LOADER_CONCURRENCY)
+    upsert_semaphore = asyncio.Semaphore(UPSERT_WORKERS)
+
+    async def run_bounded(loader: Loader) -> list[Document]:
+        async with semaphore:
+            return await run_loader(loader)
+
+    async def embed_and_upsert(chroma: Chroma, batch: list[Document]) -> int:
+        embeddings = await embed_documents(batch)
+        async with upsert_semaphore:
+            await asyncio.to_thread(_upsert_batch, chroma, batch, embeddings)
+        return len(batch)
+
+    with Chroma(
+        collection_name=collection_name,
+        client_type=settings.chroma_client_type,
+    ) as chroma:
+        total = 0
+        for loader_future in asyncio.as_completed(
+            [run_bounded(loader) for loader in prefect_loaders]
+        ):
+            documents = await loader_future
+            total += sum(
+                await asyncio.gather(
+                    *(
+                        embed_and_upsert(chroma, documents[i : i + UPSERT_BATCH_SIZE])
+                        for i in range(0, len(documents), UPSERT_BATCH_SIZE)
+                    )
+                )
+            )
+        logger.info(f"Upserted {total} documents")
+
+
+if __name__ == "__main__":
+    asyncio.run(refresh_chroma())
@@ -1,12 +1,17 @@
-from typing import Any, Callable, Generic, TypeAlias, TypedDict, TypeVar
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, ClassVar, Generic, TypeAlias, TypedDict, TypeVar
 
+import orjson
 from prefect.artifacts import create_markdown_artifact
 from prefect.cache_policies import NONE
 from pydantic import TypeAdapter
 from pydantic_ai import Agent
 from pydantic_ai.messages import ModelMessage
 from pydantic_ai.models import KnownModelName, ModelSettings
-from pydantic_core import to_json
+from pydantic_core import _pydantic_core, to_json
 
 from slacky.logging import get_logger
 from slacky.settings import settings
@@ -22,20 +27,182 @@ from slacky.wrap import WatchToolCalls
 T = TypeVar("T")
 
 logger = get_logger(__name__)
+
+# pydantic-core should always be the compiled extension; anything else
+# (e.g. a fallback pure-python build) makes validation/serialization far slower
+if not getattr(_pydantic_core, "__file__", "").endswith((".so", ".pyd")):
+    logger.warning(
+        "pydantic-core does not appear to be a compiled build - "
+        "validation and serialization will be significantly slower"
+    )
+# legacy per-thread snapshot format, kept for migration on load
 MessageHistoryCache: TypeAlias = dict[str, list[ModelMessage]]
 MessageHistoryCacheAdapter = TypeAdapter(MessageHistoryCache)
+ModelMessagesAdapter = TypeAdapter(list[ModelMessage])
+ModelMessageAdapter = TypeAdapter(ModelMessage)
+
+
+class MessageHistorySnapshot(TypedDict):
+    """On-disk shape of the interned message store."""
+
+    msgs: list[ModelMessage]
+    threads: dict[str, list[int]]
+
+
+MessageHistorySnapshotAdapter = TypeAdapter(MessageHistorySnapshot)
 
 
-def _load_message_cache() -> MessageHistoryCache:
-    """Load the message cache from the settings file."""
-    if not (cache_data := settings.message_cache_path.read_bytes()):
-        return {}
+def _message_digest(message: ModelMessage) -> bytes:
+    """Stable digest of a message's JSON form, used for interning."""
+    return hashlib.blake2b(ModelMessageAdapter.dump_json(message)).digest()
+
+
+class MessageStore:
+    """Message history with repeated payloads stored once.
+
+    System prompts and tool schemas repeat on every turn; storing unique
+    messages once plus an integer sequence per thread keeps the cache
+    (and its parse time) proportional to unique content, not turns.
+    """
+
+    def __init__(
+        self,
+        msgs: list[ModelMessage] | None = None,
+        threads: dict[str, list[int]] | None = None,
+    ) -> None:
+        self.msgs = msgs or []
+        self.threads = threads or {}
+        self._index = {_message_digest(m): i for i, m in enumerate(self.msgs)}
+
+    def thread_messages(self, thread_ts: str) -> list[ModelMessage]:
+        """Materialize the messages for a thread."""
+        return [self.msgs[i] for i in self.threads.get(thread_ts, [])]
+
+    def extend(
+        self, thread_ts: str, new_messages: list[ModelMessage]
+    ) -> tuple[list[ModelMessage], list[int]]:
+        """Intern new messages into a thread.
+
+        Returns the messages that weren't seen before and the indices
+        appended to the thread's sequence.
+        """
+        added: list[ModelMessage] = []
+        appended: list[int] = []
+        for message in new_messages:
+            digest = _message_digest(message)
+            if (index := self._index.get(digest)) is None:
+                index = self._index[digest] = len(self.msgs)
+                self.msgs.append(message)
+                added.append(message)
+            appended.append(index)
+        self.threads.setdefault(thread_ts, []).extend(appended)
+        return added, appended
+
+    def replay(
+        self, thread_ts: str, new_messages: list[ModelMessage], appended: list[int]
+    ) -> None:
+        """Apply one append-log entry."""
+        for message in new_messages:
+            self._index[_message_digest(message)] = len(self.msgs)
+            self.msgs.append(message)
+        self.threads.setdefault(thread_ts, []).extend(appended)
+
+
+# How many appended log entries to tolerate before folding them into the snapshot.
+COMPACTION_THRESHOLD = 256
+
+
+def _message_log_path() -> Path:
+    return settings.message_cache_path.with_suffix(".jsonl")
+
+
+def _load_message_cache() -> MessageStore:
+    """Load the snapshot from disk, then replay the append-only log on top."""
+    store = MessageStore()
+    if cache_data := settings.message_cache_path.read_bytes():
+        try:
+            snapshot = MessageHistorySnapshotAdapter.validate_json(cache_data)
+            store = MessageStore(snapshot["msgs"], snapshot["threads"])
+        except ValueError:
+            # legacy per-thread snapshot; intern it into the new shape
+            legacy = MessageHistoryCacheAdapter.validate_json(cache_data)
+            for thread_ts, messages in legacy.items():
+                store.extend(thread_ts, messages)
+
+    if (log_path := _message_log_path()).exists():
+        with log_path.open("rb") as log_file:
+            for line in log_file:
+                if not (line := line.strip()):
+                    continue
+                entry = orjson.loads(line)
+                if "msgs" in entry:  # legacy log entry, pre-interning
+                    store.extend(
+                        entry["thread_ts"],
+                        ModelMessagesAdapter.validate_python(entry["msgs"]),
+                    )
+                else:
+                    store.replay(
+                        entry["thread_ts"],
+                        ModelMessagesAdapter.validate_python(entry["new"]),
+                        entry["seq"],
+                    )
 
-    message_history = MessageHistoryCacheAdapter.validate_json(cache_data)
     logger.info("Loaded message history")
-    for thread_ts, messages in message_history.items():
-        logger.info(f"Thread {thread_ts} has {len(messages)} messages")
-    return message_history
+    for thread_ts, appended in store.threads.items():
+        logger.info(f"Thread {thread_ts} has {len(appended)} messages")
+    return store
+
+
+# Response artifacts are best-effort observability: bounded queue, oldest
+# entries dropped under pressure, consumed by artifact_worker (started in
+# the FastAPI lifespan) so markdown building never blocks a Slack reply.
+_artifact_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=256)
+
+
+def _enqueue_artifact(payload: dict[str, Any]) -> None:
+    try:
+        _artifact_queue.put_nowait(payload)
+    except asyncio.QueueFull:
+        _artifact_queue.get_nowait()
+        _artifact_queue.put_nowait(payload)
+
+
+async def artifact_worker() -> None:
+    """Build and publish response artifacts off the reply path."""
+    while True:
+        payload = await _artifact_queue.get()
+        context_json = to_json(
+            {
+                "thread_ts": payload["thread_ts"],
+                "channel_id": payload["channel_id"],
+                "messages": payload["messages"],
+            }
+        ).decode("utf-8")
+        try:
+            await create_markdown_artifact(
+                key="agent-response",
+                markdown=f"""## {payload["agent_name"]} responded in {payload["channel_id"]}/{payload["thread_ts"]}
+### system prompt
+
+{payload["system_prompt"]}
+
+### user prompt
+
+{payload["message"]}
+
+### thread context
+
+```json
+{context_json}
+```
+
+### response
+{payload["response"]}""",
+                description="Agent response",
+                _sync=False,  # type: ignore
+            )
+        except Exception as exc:
+            logger.warning(f"Failed to create response artifact: {exc}")
 
 
 class ThreadContext(TypedDict):
@@ -49,6 +216,19 @@ class ThreadContext(TypedDict):
 class SlackAgent(Generic[T]):
     """A Slack agent powered by PydanticAI."""
 
+    _shared_history: ClassVar[MessageStore | None] = None
+    _history_lock: ClassVar[threading.Lock] = threading.Lock()
+    _history_future: ClassVar[asyncio.Future[MessageStore] | None] = None
+
+    @classmethod
+    def shared_history(cls) -> MessageStore:
+        """Load the message cache once and share it across all instances."""
+        if cls._shared_history is None:
+            with cls._history_lock:
+                if cls._shared_history is None:
+                    cls._shared_history = _load_message_cache()
+        return cls._shared_history
+
     def __init__(
         self,
         model: KnownModelName,
@@ -58,7 +238,22 @@ class SlackAgent(Generic[T]):
     ) -> None:
         """Initialize the agent with a model and optional system prompt."""
         self.model = model
-        self._message_history: MessageHistoryCache = _load_message_cache()
+        # kick the cache load onto a worker thread so JSON validation
+        # overlaps with the Agent construction below; awaited on first use.
+        # the pending future is class-level so agents constructed while a
+        # load is in flight share it instead of racing to divergent stores
+        if SlackAgent._shared_history is None and SlackAgent._history_future is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.shared_history()
+            else:
+                SlackAgent._history_future = loop.run_in_executor(
+                    None, self.shared_history
+                )
+        self._message_history: MessageStore | None = SlackAgent._shared_history
+        self._message_log: Any = None
+        self._appended_entries = 0
         self._system_prompt = system_prompt or "You are a helpful Slack assistant."
 
         self.agent = Agent[ThreadContext, T](
@@ -71,12 +266,48 @@ class SlackAgent(Generic[T]):
             tools=tools,
         )
 
-    def _save_message_cache(self) -> None:
-        """Save the message cache to disk."""
-        logger.info("Saving message history to disk")
+    def _append_to_message_log(
+        self, thread_ts: str, added: list[ModelMessage], appended: list[int]
+    ) -> None:
+        """Append just the newly interned messages to the JSONL log.
+
+        O(new messages) written per call instead of rewriting the whole cache.
+        """
+        if self._message_log is None:
+            self._message_log = _message_log_path().open("ab")
+        # messages are dumped by pydantic (orjson can't serialize `ModelMessage`)
+        # and spliced into the envelope as a pre-serialized fragment
+        self._message_log.write(
+            orjson.dumps(
+                {
+                    "thread_ts": thread_ts,
+                    "new": orjson.Fragment(ModelMessagesAdapter.dump_json(added)),
+                    "seq": appended,
+                }
+            )
+            + b"\n"
+        )
+        self._message_log.flush()
+        self._appended_entries += 1
+        if self._appended_entries >= COMPACTION_THRESHOLD:
+            self._compact_message_cache()
+
+    def _compact_message_cache(self) -> None:
+        """Fold the append-only log into the snapshot and truncate the log."""
+        logger.info("Compacting message history snapshot")
         settings.message_cache_path.write_bytes(
-            MessageHistoryCacheAdapter.dump_json(self._message_history, indent=2)
+            MessageHistorySnapshotAdapter.dump_json(
+                MessageHistorySnapshot(
+                    msgs=self._message_history.msgs,
+                    threads=self._message_history.threads,
+                )
+            )
         )
+        if self._message_log is not None:
+            self._message_log.close()
+            self._message_log = None
+        _message_log_path().write_bytes(b"")
+        self._appended_entries = 0
 
     async def handle_message(
         self,
@@ -87,12 +318,17 @@ class SlackAgent(Generic[T]):
     ) -> T:
         """Handle a message in a thread."""
         logger.info(f"Handling message in thread {thread_ts}")
+        if self._message_history is None:
+            if (store := SlackAgent._shared_history) is None:
+                assert SlackAgent._history_future is not None
+                store = await SlackAgent._history_future
+            self._message_history = store
         logger.info(
-            f"Current message history keys: {list(self._message_history.keys())}"
+            f"Current message history keys: {list(self._message_history.threads)}"
         )
 
         # Get or create message history for this thread
-        thread_messages = self._message_history.get(thread_ts, [])
+        thread_messages = self._message_history.thread_messages(thread_ts)
         logger.info(
             f"Found {len(thread_messages)} existing messages for thread {thread_ts}"
         )
@@ -119,52 +355,44 @@ class SlackAgent(Generic[T]):
                 deps=thread_context,
             )
 
-        await create_markdown_artifact(
-            key="agent-response",
-            markdown=f"""## {self.agent.name} responded in {channel_id}/{thread_ts}
-### system prompt
-
-{self._system_prompt}
-
-### user prompt
-
-{message}
-
-### thread context
-
-```json
-{to_json(thread_context, indent=2).decode("utf-8")}
-```
-
-### response
-{result.data}""",
-            description="Agent response",
-            _sync=False,  # type: ignore
-        )
+        if settings.create_artifacts:
+            # hand the raw inputs to the background worker; only the tail
+            # of the thread so the artifact stays O(1) as history grows
+            _enqueue_artifact(
+                {
+                    "agent_name": self.agent.name,
+                    "system_prompt": self._system_prompt,
+                    "message": message,
+                    "thread_ts": thread_ts,
+                    "channel_id": channel_id,
+                    "messages": thread_messages[-10:],
+                    "response": result.data,
+                }
+            )
 
-        # Update message history by extending existing messages
+        # Intern the new messages, then persist only what's actually new
         new_messages = result.new_messages()
-        if thread_ts not in self._message_history:
-            self._message_history[thread_ts] = []
-        self._message_history[thread_ts].extend(new_messages)
-
-        # Save updated message history
-        self._save_message_cache()
+        added, appended = self._message_history.extend(thread_ts, new_messages)
+        self._append_to_message_log(thread_ts, added, appended)
 
         logger.info(f"Updated thread {thread_ts} with {len(new_messages)} new messages")
         logger.debug(
-            f"Thread now has {len(self._message_history[thread_ts])} total messages"
+            f"Thread now has {len(self._message_history.threads[thread_ts])} "
+            "total messages"
         )
 
         return result.data
 
 
+_agent_cache: dict[tuple[Any, ...], "SlackAgent[Any]"] = {}
+
+
 def get_agent(
     tools: list[Callable[..., Any]] | None = None,
     system_prompt: str | None = None,
     result_type: type[T] = str,
 ) -> SlackAgent[T]:
-    """Get the Slack agent."""
+    """Get the Slack agent, reusing a cached instance when possible."""
     if tools is None:
         tools = [
             query_knowledgebase,
@@ -173,9 +401,12 @@ def get_agent(
             google_search,
             trigger_prefect_deployment,
         ]
-    return SlackAgent[result_type](
-        model=settings.ai_model,
-        system_prompt=system_prompt or settings.base_system_prompt,
-        tools=tools,
-        result_type=result_type,
-    )
+    cache_key = (tuple(id(tool) for tool in tools), system_prompt, result_type)
+    if (agent := _agent_cache.get(cache_key)) is None:
+        agent = _agent_cache[cache_key] = SlackAgent[result_type](
+            model=settings.ai_model,
+            system_prompt=system_prompt or settings.base_system_prompt,
+            tools=tools,
+            result_type=result_type,
+        )
+    return agent
@@ -2,17 +2,60 @@ import asyncio
 from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator
 
+import orjson
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from starlette.routing import Route
 
+from .agent import artifact_worker
 from .handlers import handle_message, handle_reaction
-from .listener import listen_for_events
+from .listener import document_writer, listen_for_events
 from .logging import get_logger
+from .http import close_http_clients
 from .utils import verify_slack_request
+from .vectorstore import close_vectorstores
 
 logger = get_logger(__name__)
 
+# Rapid mentions in the same thread within this window are coalesced into
+# a single agent call instead of spawning one flow run per event.
+DEBOUNCE_SECONDS = 0.25
+_message_queue: asyncio.Queue[tuple[str, str, str]] = asyncio.Queue(maxsize=1024)
+
+# Threads that are queued or being processed; Slack retries for these are
+# acknowledged without spawning a duplicate flow run.
+_in_flight_threads: set[str] = set()
+
+
+async def _process_thread(message: str, thread_ts: str, channel: str) -> None:
+    """Run handle_message, tracking the thread as in-flight for retry dedupe."""
+    try:
+        await handle_message(message=message, thread_ts=thread_ts, channel=channel)
+    finally:
+        _in_flight_threads.discard(thread_ts)
+
+
+async def _dispatch_messages() -> None:
+    """Drain the message queue, grouping events by thread per debounce window."""
+    while True:
+        text, thread_ts, channel = await _message_queue.get()
+        pending: dict[tuple[str, str], list[str]] = {(thread_ts, channel): [text]}
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + DEBOUNCE_SECONDS
+        while (timeout := deadline - loop.time()) > 0:
+            try:
+                text, thread_ts, channel = await asyncio.wait_for(
+                    _message_queue.get(), timeout=timeout
+                )
+            except TimeoutError:
+                break
+            pending.setdefault((thread_ts, channel), []).append(text)
+
+        for (thread_ts, channel), texts in pending.items():
+            asyncio.ensure_future(_process_thread("\n".join(texts), thread_ts, channel))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
@@ -24,10 +67,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         )
 
     asyncio.create_task(listen_for_events())
+    asyncio.create_task(_dispatch_messages())
+    asyncio.create_task(artifact_worker())
+    asyncio.create_task(document_writer())
     yield
+    close_vectorstores()
+    await close_http_clients()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 class SlackEvent(BaseModel):
@@ -40,11 +88,12 @@ class SlackEvent(BaseModel):
 async def handle_slack_event(request: Request):
     logger.debug(f"Received request: {request.method} {request.url.path}")
     logger.debug(f"Headers: {request.headers}")
-    if not await verify_slack_request(request):
+    # read the body once and reuse it for both verification and parsing
+    raw_body = await request.body()
+    if not await verify_slack_request(request, raw_body):
         raise HTTPException(status_code=400, detail="Invalid request signature")
 
-    body = await request.json()
-    event = SlackEvent(**body)
+    event = SlackEvent(**orjson.loads(raw_body))
 
     if event.type == "url_verification":
         return {"challenge": event.challenge}
@@ -64,16 +113,25 @@ async def handle_slack_event(request: Request):
             assert thread_ts is not None, "thread_ts is required"
             assert channel is not None, "channel is required"
 
+            if (
+                thread_ts in _in_flight_threads
+                and request.headers.get("X-Slack-Retry-Num")
+                and request.headers.get("X-Slack-Retry-Reason") == "http_timeout"
+            ):
+                # Slack re-sends events it thinks timed out; the original
+                # is still running, so ack without double-posting
+                logger.info(f"Ignoring Slack retry for in-flight thread {thread_ts}")
+                return {"ok": True}
+
             logger.info(f"Backgrounding message processing for thread {thread_ts}")
             logger.debug(f"Message text: {text}")
 
-            asyncio.ensure_future(
-                handle_message(
-                    message=text,
-                    thread_ts=thread_ts,
-                    channel=channel,
-                )
-            )
+            _in_flight_threads.add(thread_ts)
+            try:
+                _message_queue.put_nowait((text, thread_ts, channel))
+            except asyncio.QueueFull:
+                # don't drop messages under burst; skip the debounce instead
+                asyncio.ensure_future(_process_thread(text, thread_ts, channel))
             logger.info(f"Backgrounded message processing for thread {thread_ts}")
 
     return {"ok": True}
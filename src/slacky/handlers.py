@@ -6,8 +6,9 @@ from prefect.events import emit_event
 
 from .agent import get_agent
 from .logging import get_logger
+from .settings import settings
 from .utils import (
-    get_channel_name,
+    cached_channel_name,
     is_positive_reaction,
     scrub_app_mention,
     send_slack_message,
@@ -16,7 +17,6 @@ from .utils import (
 logger = get_logger(__name__)
 
 
-@flow
 async def run_agent(
     message: str,
     thread_ts: str,
@@ -29,9 +29,16 @@ async def run_agent(
     return await get_agent(tools).handle_message(cleaned_message, thread_ts, channel)
 
 
+# tracked variant for when subflow-level run history is worth the extra
+# Prefect API round trips per message
+_run_agent_tracked = flow(run_agent)
+
+
 def _generate_flow_run_name() -> str:
     parameters = prefect.runtime.flow_run.parameters
-    channel_name = get_channel_name(parameters.get("channel"))
+    channel = parameters.get("channel")
+    # this hook is sync - use whatever name is cached, fall back to the id
+    channel_name = cached_channel_name(channel) or channel
     return f"handle message in {channel_name}/{parameters.get('thread_ts')}"
 
 
@@ -50,7 +57,8 @@ async def handle_message(
     logger.debug(f"Processing message from thread {thread_ts} in background: {message}")
 
     try:
-        agent_response = await run_agent(
+        runner = _run_agent_tracked if settings.trace_subflows else run_agent
+        agent_response = await runner(
             message=message, thread_ts=thread_ts, channel=channel
         )
 
@@ -0,0 +1,33 @@
+"""Shared HTTP clients, created once per process.
+
+Keeping one long-lived client per host means the TLS session and
+keep-alive connections are reused across calls instead of paying a new
+TCP+TLS handshake each time; HTTP/2 lets concurrent calls multiplex
+over one connection.
+"""
+
+import httpx
+
+from .settings import settings
+
+SLACK_CLIENT = httpx.AsyncClient(
+    base_url="https://slack.com/api",
+    headers={"Authorization": f"Bearer {settings.bot_token.get_secret_value()}"},
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    timeout=10.0,
+)
+
+
+GOOGLE_CLIENT = httpx.AsyncClient(
+    base_url="https://www.googleapis.com",
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=8),
+    timeout=10.0,
+)
+
+
+async def close_http_clients() -> None:
+    """Close the shared clients; called from the FastAPI lifespan."""
+    await SLACK_CLIENT.aclose()
+    await GOOGLE_CLIENT.aclose()
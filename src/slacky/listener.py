@@ -1,17 +1,19 @@
-from typing import TypedDict
+import asyncio
+import hashlib
+from typing import Any, TypedDict
 
-import httpx
-from prefect import flow, task
-from prefect.events import get_events_subscriber
+from prefect import flow
+from prefect.events import Event, get_events_subscriber
 from prefect.settings import PREFECT_UI_URL
 from raggy.documents import Document
-from raggy.vectorstores.chroma import Chroma
 
 from .agent import get_agent
 from .logging import get_logger
 from .settings import settings
 from .tools import query_knowledgebase
+from .http import SLACK_CLIENT
 from .utils import get_channel_name, send_slack_message
+from .vectorstore import get_vectorstore
 
 logger = get_logger(__name__)
 
@@ -21,7 +23,44 @@ class QAPair(TypedDict):
     answer: str
 
 
-@task
+# Liked-thread summaries are buffered and flushed in batches so each liked
+# message doesn't pay a full Chroma open/add/close cycle of its own.
+DOCUMENT_FLUSH_INTERVAL_SECONDS = 30
+DOCUMENT_FLUSH_BATCH_SIZE = 16
+_document_queue: asyncio.Queue[Document] = asyncio.Queue(maxsize=1024)
+
+
+async def document_writer() -> None:
+    """Flush queued documents to the knowledgebase every N docs or T seconds."""
+    while True:
+        batch = [await _document_queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + DOCUMENT_FLUSH_INTERVAL_SECONDS
+        while (
+            len(batch) < DOCUMENT_FLUSH_BATCH_SIZE
+            and (timeout := deadline - loop.time()) > 0
+        ):
+            try:
+                batch.append(
+                    await asyncio.wait_for(_document_queue.get(), timeout=timeout)
+                )
+            except TimeoutError:
+                break
+
+        # the add is synchronous CPU+disk work (HNSW update, SQLite commit);
+        # run it on a thread so the subscriber loop keeps draining events.
+        # it also makes network calls (embeddings), so a failed flush must
+        # not kill the worker - log and keep draining the queue
+        try:
+            await asyncio.to_thread(get_vectorstore(settings.namespace).add, batch)
+        except Exception:
+            logger.exception(
+                f"Failed to flush {len(batch)} documents to the knowledgebase"
+            )
+        else:
+            logger.info(f"Flushed {len(batch)} documents to the knowledgebase")
+
+
 async def summarize_conversation(
     conversation: str, thread_ts: str, channel: str
 ) -> QAPair:
@@ -33,81 +72,98 @@ async def summarize_conversation(
 @flow
 async def process_liked_response(thread_ts: str, channel: str) -> None:
     """Process a liked response by saving it to the knowledgebase."""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://slack.com/api/conversations.replies",
-            params={"channel": channel, "ts": thread_ts},
-            headers={
-                "Authorization": f"Bearer {settings.bot_token.get_secret_value()}"
-            },
-        )
+    # threads >200 messages require cursor pagination; fetch full pages
+    # until Slack stops handing back a cursor
+    messages: list[dict[str, Any]] = []
+    cursor: str | None = None
+    while True:
+        params: dict[str, Any] = {"channel": channel, "ts": thread_ts, "limit": 200}
+        if cursor:
+            params["cursor"] = cursor
+        response = await SLACK_CLIENT.get("/conversations.replies", params=params)
         response.raise_for_status()
         thread = response.json()
+        messages.extend(thread.get("messages", []))
+        if not (cursor := thread.get("response_metadata", {}).get("next_cursor")):
+            break
 
-    if not thread.get("messages"):
+    if not messages:
         logger.warning(f"No messages found in thread {thread_ts}")
         return
 
     # Combine all messages in the thread
-    conversation = "\n".join(
-        f"{msg.get('user', msg.get('bot_id', 'unknown'))}: {msg['text']}"
-        for msg in thread["messages"]
-    )
+    parts: list[str] = [""] * len(messages)
+    for i, msg in enumerate(messages):
+        user = msg.get("user") or msg.get("bot_id") or "unknown"
+        parts[i] = f"{user}: {msg['text']}"
+    conversation = "\n".join(parts)
 
     qa_pair = await summarize_conversation(conversation, thread_ts, channel)
     summary = f"Q: {qa_pair['question']}\nA: {qa_pair['answer']}"
+
+    # archive the full conversation to disk and keep only its hash in
+    # metadata - full thread text bloats every subsequent Chroma write
+    conversation_hash = hashlib.sha256(conversation.encode()).hexdigest()
+    archive_path = settings.thread_archive_dir / f"{conversation_hash}.txt"
+    await asyncio.to_thread(archive_path.write_text, conversation)
+
     document = Document(
         text=summary,
         metadata={
             "thread_ts": thread_ts,
             "channel": channel,
-            "channel_name": get_channel_name(channel),
+            "channel_name": await get_channel_name(channel),
             "type": "liked_thread",
             "source": "slack",
-            "raw_conversation": conversation,
+            "conversation_hash": conversation_hash,
         },
     )
-    logger.info(f"Saved summary to knowledgebase: {summary}")
-
-    with Chroma(
-        collection_name=settings.namespace,
-        client_type=settings.chroma_client_type,
-    ) as vectorstore:
-        vectorstore.add([document])
-        logger.info(f"Saved liked thread {thread_ts} to knowledgebase")
+    await _document_queue.put(document)
+    logger.info(f"Queued liked thread {thread_ts} summary for the knowledgebase")
+    logger.debug(f"Summary: {summary}")
+
+
+# one slow handler (e.g. a Chroma write) shouldn't stall every event
+# behind it; handle events concurrently with a bounded fan-out
+EVENT_CONCURRENCY = 8
+
+
+async def _handle_event(event: Event, semaphore: asyncio.Semaphore) -> None:
+    """Handle a single subscriber event."""
+    async with semaphore:
+        if event.event == "slackbot.response.liked":
+            thread_ts = event.resource.get("prefect.resource.id")
+            channel = event.resource.get("channel")
+
+            if thread_ts and channel:
+                await process_liked_response(thread_ts=thread_ts, channel=channel)
+            else:
+                logger.warning("Missing thread_ts or channel in liked response event")
+
+        if event.event == "prefect.flow-run.Completed" and any(
+            resource.get("prefect.resource.id") == "prefect.tag.ai-triggered"
+            and resource.get("prefect.resource.role") == "tag"
+            for resource in event.related
+        ):
+            flow_run_resource_id = event.resource.get("prefect.resource.id")
+            assert flow_run_resource_id
+            flow_run_id = flow_run_resource_id.split(".")[-1]
+            flow_run_url = f"{PREFECT_UI_URL}/runs/flow-run/{flow_run_id}"
+            await send_slack_message(
+                channel=settings.notification_channel_id,
+                text=(
+                    f"hey your flow run I triggered earlier is complete\n"
+                    f"view it [here]({flow_run_url})"
+                ),
+            )
 
 
 async def listen_for_events() -> None:
     """Listen for events and handle them."""
+    semaphore = asyncio.Semaphore(EVENT_CONCURRENCY)
 
     async with get_events_subscriber(filter=None) as subscriber:
-        async for event in subscriber:
-            logger.info(f"📥 event: {event.event}")
-
-            if event.event == "slackbot.response.liked":
-                thread_ts = event.resource.get("prefect.resource.id")
-                channel = event.resource.get("channel")
-
-                if thread_ts and channel:
-                    await process_liked_response(thread_ts=thread_ts, channel=channel)
-                else:
-                    logger.warning(
-                        "Missing thread_ts or channel in liked response event"
-                    )
-
-            if event.event == "prefect.flow-run.Completed" and any(
-                resource.get("prefect.resource.id") == "prefect.tag.ai-triggered"
-                and resource.get("prefect.resource.role") == "tag"
-                for resource in event.related
-            ):
-                flow_run_resource_id = event.resource.get("prefect.resource.id")
-                assert flow_run_resource_id
-                flow_run_id = flow_run_resource_id.split(".")[-1]
-                flow_run_url = f"{PREFECT_UI_URL}/runs/flow-run/{flow_run_id}"
-                await send_slack_message(
-                    channel=settings.notification_channel_id,
-                    text=(
-                        f"hey your flow run I triggered earlier is complete\n"
-                        f"view it [here]({flow_run_url})"
-                    ),
-                )
+        async with asyncio.TaskGroup() as tg:
+            async for event in subscriber:
+                logger.info(f"📥 event: {event.event}")
+                tg.create_task(_handle_event(event, semaphore))
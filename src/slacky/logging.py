@@ -1,13 +1,12 @@
 import logging
 from typing import Any
-from functools import lru_cache
 from rich.console import Console
 from rich.logging import RichHandler
 
 console = Console()
 
-@lru_cache
 def get_logger(name: str) -> logging.Logger:
+    # logging.Manager already caches loggers by name; no extra cache needed
     return logging.getLogger(name)
 
 
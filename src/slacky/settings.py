@@ -11,6 +11,7 @@ from slacky.logging import setup_logging
 
 DEFAULT_BASE_SYSTEM_PROMPT_PATH = Path("~/.slacky/base_system_prompt.txt").expanduser()
 MESSAGE_CACHE = Path("~/.slacky/message_cache.json").expanduser()
+THREAD_ARCHIVE_DIR = Path("~/.slacky/threads").expanduser()
 
 
 class Settings(BaseSettings):
@@ -36,11 +37,24 @@ class Settings(BaseSettings):
         default=MESSAGE_CACHE,
         description="Path to message cache file",
     )
+    thread_archive_dir: Path = Field(
+        default=THREAD_ARCHIVE_DIR,
+        description="Directory for archived thread conversations",
+    )
     host: str = Field(default="0.0.0.0", description="Host to run the server on")
     port: int = Field(default=8000, description="Port to run the server on")
 
     log_level: str = Field(default="INFO", description="Logging level")
 
+    create_artifacts: bool = Field(
+        default=False,
+        description="Create a markdown artifact for each agent response",
+    )
+    trace_subflows: bool = Field(
+        default=False,
+        description="Run the agent as a tracked Prefect subflow",
+    )
+
     bot_token: SecretStr = Field(
         default=..., description="Slack Bot User OAuth Token - starts with 'xoxb-'"
     )
@@ -87,6 +101,9 @@ class Settings(BaseSettings):
         if (cache_path := values.get("message_cache_path")) and not cache_path.exists():
             cache_path.parent.mkdir(parents=True, exist_ok=True)
             cache_path.touch()
+        if not values.get("thread_archive_dir"):
+            values["thread_archive_dir"] = THREAD_ARCHIVE_DIR
+        Path(values["thread_archive_dir"]).mkdir(parents=True, exist_ok=True)
         return values
 
     @model_validator(mode="after")
@@ -1,21 +1,36 @@
 import asyncio
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
-import httpx
-from prefect import flow, task
-from prefect.client.schemas.objects import FlowRun
-from prefect.deployments import run_deployment
-from raggy.loaders.github import GitHubRepoLoader
-from raggy.loaders.web import SitemapLoader
+from raggy.documents import Document
+from raggy.utilities.embeddings import create_openai_embeddings
 from raggy.vectorstores.chroma import Chroma, query_collection
 
+from .http import GOOGLE_CLIENT
 from .settings import settings
 from .utils import get_logger
+from .vectorstore import get_vectorstore
 
 logger = get_logger(__name__)
 
 
-def add_sitemap_to_knowledgebase(
+def batch_add(
+    vectorstore: Chroma, documents: list[Document], batch_size: int = 1000
+) -> list[Document]:
+    """Add documents to a vectorstore in bounded batches.
+
+    Chroma's add path degrades when handed very large document lists at
+    once; slicing keeps each underlying transaction reasonably sized.
+    """
+    added: list[Document] = []
+    for i in range(0, len(documents), batch_size):
+        added.extend(vectorstore.add(documents[i : i + batch_size]))
+    return added
+
+
+async def add_sitemap_to_knowledgebase(
     sitemap_url: str, collection_name: str = "slacky"
 ) -> str:
     """Add a sitemap (like https://prefect.io/sitemap.xml) to the knowledgebase.
@@ -26,22 +41,24 @@ def add_sitemap_to_knowledgebase(
     Returns:
         A message indicating the number of documents added to the knowledgebase.
     """
+    from raggy.loaders.web import SitemapLoader
+
     loader = SitemapLoader(urls=[sitemap_url])
-    documents = asyncio.run(loader.load())
+    documents = await loader.load()
     namespace = collection_name or settings.namespace
-    with Chroma(
-        collection_name=namespace,
-        client_type=settings.chroma_client_type,
-    ) as vectorstore:
-        documents = vectorstore.add(documents)
-        message = (
-            f"Added {len(documents)} documents from {sitemap_url} to the knowledgebase"
-        )
-        logger.info(message)
-        return message
+    documents = await asyncio.to_thread(
+        batch_add, get_vectorstore(namespace), documents
+    )
+    message = (
+        f"Added {len(documents)} documents from {sitemap_url} to the knowledgebase"
+    )
+    logger.info(message)
+    return message
 
 
-def add_github_repo_to_knowledgebase(repo: str, collection_name: str = "slacky") -> str:
+async def add_github_repo_to_knowledgebase(
+    repo: str, collection_name: str = "slacky"
+) -> str:
     """Add a GitHub repo to the knowledgebase.
 
     Args:
@@ -50,21 +67,98 @@ def add_github_repo_to_knowledgebase(repo: str, collection_name: str = "slacky")
     Returns:
         A message indicating the number of documents added to the knowledgebase.
     """
+    from raggy.loaders.github import GitHubRepoLoader
+
     loader = GitHubRepoLoader(repo=repo, include_globs=["README.md", "**/*.py"])
-    documents = asyncio.run(loader.load())
+    documents = await loader.load()
     namespace = collection_name or settings.namespace
-    with Chroma(
-        collection_name=namespace,
-        client_type=settings.chroma_client_type,
-    ) as vectorstore:
-        documents = vectorstore.add(documents)
-        message = f"Added {len(documents)} documents from {repo} to the knowledgebase"
-        logger.info(message)
-        return message
-
-
-@flow
-def query_knowledgebase(queries: list[str], collection_name: str = "slacky") -> str:
+    documents = await asyncio.to_thread(
+        batch_add, get_vectorstore(namespace), documents
+    )
+    message = f"Added {len(documents)} documents from {repo} to the knowledgebase"
+    logger.info(message)
+    return message
+
+
+# Near-duplicate questions ("What is X?" vs "Tell me about X") skip the
+# Chroma+summarization path entirely: exact repeats hit a small in-memory
+# LRU, paraphrases hit a dedicated cache collection queried by embedding
+# distance. Entries expire so a refreshed knowledgebase doesn't keep
+# serving old answers.
+QUERY_CACHE_COLLECTION = "__qcache__"
+# squared L2 between unit-normalized OpenAI vectors (~= cosine sim >= 0.96)
+QUERY_CACHE_MAX_DISTANCE = 0.08
+QUERY_CACHE_TTL_SECONDS = 3600
+QUERY_CACHE_SIZE = 10_000
+QUERY_CACHE_PRUNE_EVERY = 64
+
+_query_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+# lookups and stores run on asyncio.to_thread workers; the LRU is not
+# thread-safe on its own
+_query_cache_lock = threading.Lock()
+_stores_since_prune = 0
+
+
+def _normalize_query(query: str) -> str:
+    return query.strip().lower()
+
+
+def _query_cache_lookup(normalized: str, embedding: list[float]) -> str | None:
+    """Check the exact-match LRU, then the semantic cache collection."""
+    with _query_cache_lock:
+        if (entry := _query_cache.pop(normalized, None)) is not None:
+            answer, expires_at = entry
+            if expires_at > time.time():
+                # re-insert at the MRU end
+                _query_cache[normalized] = (answer, expires_at)
+                return answer
+
+    # query with the precomputed vector - no embedding function runs here
+    results = get_vectorstore(QUERY_CACHE_COLLECTION).collection.query(
+        query_embeddings=[embedding],
+        n_results=1,
+        include=["metadatas", "distances"],
+    )
+    if (
+        results["distances"]
+        and results["distances"][0]
+        and results["distances"][0][0] <= QUERY_CACHE_MAX_DISTANCE
+    ):
+        metadata = results["metadatas"][0][0]
+        if metadata["expires_at"] > time.time():
+            return metadata["answer"]
+    return None
+
+
+def _query_cache_store(normalized: str, embedding: list[float], answer: str) -> None:
+    global _stores_since_prune
+
+    expires_at = time.time() + QUERY_CACHE_TTL_SECONDS
+    with _query_cache_lock:
+        _query_cache[normalized] = (answer, expires_at)
+        while len(_query_cache) > QUERY_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+        _stores_since_prune += 1
+        if prune := _stores_since_prune >= QUERY_CACHE_PRUNE_EVERY:
+            _stores_since_prune = 0
+
+    # upsert keyed by the normalized text so repeats refresh their expiry;
+    # the precomputed vector means no embedding call on the write either
+    collection = get_vectorstore(QUERY_CACHE_COLLECTION).collection
+    collection.upsert(
+        ids=[normalized],
+        documents=[normalized],
+        metadatas=[{"answer": answer, "expires_at": expires_at}],
+        embeddings=[embedding],
+    )
+    # periodically drop expired entries so the collection stays bounded
+    if prune:
+        collection.delete(where={"expires_at": {"$lt": time.time()}})
+
+
+async def query_knowledgebase(
+    queries: list[str], collection_name: str = "slacky"
+) -> str:
     """Query the knowledgebase and return the answer. provide multiple queries
     to cover idiosyncrasies in the users phrasing and the knowledgebase.
 
@@ -75,14 +169,36 @@ def query_knowledgebase(queries: list[str], collection_name: str = "slacky") ->
         The answer to the queries.
     """
     namespace = collection_name or settings.namespace
-    return "".join(
-        task(query_collection)
-        .map(queries, collection_name=namespace, max_tokens=600)
-        .result()
-    )
+
+    async def run_query(query: str) -> str:
+        normalized = _normalize_query(query)
+        # embed once; the same vector serves the cache lookup and, on a
+        # miss, the cache write
+        embedding = await create_openai_embeddings(normalized)
+        cached = await asyncio.to_thread(_query_cache_lookup, normalized, embedding)
+        if cached is not None:
+            logger.debug(f"Query cache hit: {query!r}")
+            return cached
+        answer = await asyncio.to_thread(
+            query_collection, query, collection_name=namespace, max_tokens=600
+        )
+        await asyncio.to_thread(_query_cache_store, normalized, embedding, answer)
+        return answer
+
+    # Chroma reads are thread-safe, so the blocking calls run on threads
+    # without paying Prefect's per-task orchestration overhead
+    results = await asyncio.gather(*(run_query(query) for query in queries))
+    return "".join(results)
+
+
+# unwrap the Google credentials once instead of per search
+_GOOGLE_SEARCH_AUTH = {
+    "key": settings.google_api_key.get_secret_value(),
+    "cx": settings.google_cx.get_secret_value(),
+}
 
 
-def google_search(query: str, num: int = 3) -> str:
+async def google_search(query: str, num: int = 3) -> str:
     """Use google to search the internet.
 
     Args:
@@ -92,14 +208,9 @@ def google_search(query: str, num: int = 3) -> str:
     Returns:
         The results of the search.
     """
-    response = httpx.get(
-        "https://www.googleapis.com/customsearch/v1",
-        params={
-            "q": query,
-            "key": settings.google_api_key.get_secret_value(),
-            "cx": settings.google_cx.get_secret_value(),
-            "num": num,
-        },
+    response = await GOOGLE_CLIENT.get(
+        "/customsearch/v1",
+        params={"q": query, "num": num, **_GOOGLE_SEARCH_AUTH},
     )
     response.raise_for_status()
     return response.json()
@@ -118,6 +229,8 @@ def trigger_prefect_deployment(
         The result of the deployment run.
     """
     import prefect.main  # noqa # type: ignore
+    from prefect.client.schemas.objects import FlowRun
+    from prefect.deployments import run_deployment
 
     flow_run = run_deployment(
         deployment_name,
@@ -1,13 +1,14 @@
+import asyncio
 import hashlib
 import hmac
 import re
 import time
 from typing import TypedDict, Unpack
 
-import httpx
+import orjson
 from fastapi import Request
-from prefect import task
 
+from .http import SLACK_CLIENT
 from .logging import get_logger
 from .settings import settings
 
@@ -22,11 +23,17 @@ class SlackMessage(TypedDict):
     text: str
 
 
+# Any <@U...> mention at the start of the message
+_MENTION_RE = re.compile(r"^\s*<@[A-Z0-9]+>\s*")
+
+# Markdown [text](url) links and **bold** spans
+_MD_LINK_RE = re.compile(r"\[(?P<text>[^\]]+)]\((?P<url>[^\)]+)\)")
+_BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+
+
 def scrub_app_mention(message: str) -> str:
     """Remove app mention from the message."""
-    # Remove any <@U...> mentions from the start of the message
-    cleaned = re.sub(r"^\s*<@[A-Z0-9]+>\s*", "", message)
-    return cleaned.strip()
+    return _MENTION_RE.sub("", message).strip()
 
 
 def is_positive_reaction(reaction: str | None) -> bool:
@@ -34,37 +41,44 @@ def is_positive_reaction(reaction: str | None) -> bool:
     return reaction in ("+1", "thumbsup")
 
 
-def get_channel_name(channel_id: str) -> str:
+# channel_id -> (name, expiry); channel renames are rare, so an hour's
+# staleness is fine and repeat lookups never touch Slack
+CHANNEL_NAME_TTL_SECONDS = 3600
+_channel_names: dict[str, tuple[str, float]] = {}
+_channel_names_lock = asyncio.Lock()
+
+
+def cached_channel_name(channel_id: str) -> str | None:
+    """Return the cached channel name if still fresh, without touching Slack."""
+    if (entry := _channel_names.get(channel_id)) and entry[1] > time.time():
+        return entry[0]
+    return None
+
+
+async def get_channel_name(channel_id: str) -> str:
     """Get the name of a channel from its ID."""
-    with httpx.Client() as client:
-        response = client.get(
-            f"https://slack.com/api/conversations.info?channel={channel_id}",
-            headers={
-                "Authorization": f"Bearer {settings.bot_token.get_secret_value()}"
-            },
+    if (name := cached_channel_name(channel_id)) is not None:
+        return name
+    async with _channel_names_lock:
+        if (name := cached_channel_name(channel_id)) is not None:
+            return name
+        response = await SLACK_CLIENT.get(
+            "/conversations.info", params={"channel": channel_id}
         )
         response.raise_for_status()
-        return response.json().get("channel", {}).get("name")
+        name = response.json().get("channel", {}).get("name")
+        _channel_names[channel_id] = (name, time.time() + CHANNEL_NAME_TTL_SECONDS)
+        return name
 
 
 def convert_md_links_to_slack(text: str) -> str:
     """Convert Markdown links to Slack-style links."""
-    md_link_pattern = r"\[(?P<text>[^\]]+)]\((?P<url>[^\)]+)\)"
-
-    def to_slack_link(match: re.Match[str]) -> str:
-        return f'<{match.group("url")}|{match.group("text")}>'
-
-    slack_text = re.sub(md_link_pattern, to_slack_link, text)
-
-    slack_text = re.sub(r"\*\*(.*?)\*\*", r"*\1*", slack_text)
+    slack_text = _MD_LINK_RE.sub(r"<\g<url>|\g<text>>", text)
+    return _BOLD_RE.sub(r"*\1*", slack_text)
 
-    return slack_text
 
-
-@task
 async def send_slack_message(**slack_message_kwargs: Unpack[SlackMessage]) -> None:
     """Send a message to Slack."""
-    logger = get_logger(__name__)
     message = slack_message_kwargs.get("text")
     logger.info(f"Sending message to Slack: {message}")
 
@@ -72,29 +86,51 @@ async def send_slack_message(**slack_message_kwargs: Unpack[SlackMessage]) -> No
         logger.warning("No message to send to Slack")
         return
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://slack.com/api/chat.postMessage",
-            headers={
-                "Authorization": f"Bearer {settings.bot_token.get_secret_value()}"
-            },
-            json=slack_message_kwargs | {"text": convert_md_links_to_slack(message)},
-        )
-        response.raise_for_status()
+    # serialize with orjson rather than httpx's stdlib-json `json=` path;
+    # writing text in place also avoids an extra dict merge per message
+    slack_message_kwargs["text"] = convert_md_links_to_slack(message)
+    response = await SLACK_CLIENT.post(
+        "/chat.postMessage",
+        content=orjson.dumps(slack_message_kwargs),
+        headers={"Content-Type": "application/json"},
+    )
+    response.raise_for_status()
+
+
+_SIGNING_KEY = settings.signing_secret.get_secret_value().encode()
+# the HMAC key schedule is computed once; each request copies this context
+_HMAC_TEMPLATE = hmac.new(_SIGNING_KEY, digestmod=hashlib.sha256)
 
 
-async def verify_slack_request(request: Request) -> bool:
-    """Verify that the request came from Slack"""
+async def verify_slack_request(request: Request, body: bytes | None = None) -> bool:
+    """Verify that the request came from Slack.
+
+    Pass `body` if the caller has already read it, so it's only read once.
+    """
     timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
     signature = request.headers.get("X-Slack-Signature", "")
 
-    if abs(time.time() - int(timestamp)) > 60 * 5:
+    # reject malformed requests on headers alone - no body allocation,
+    # no HMAC work for junk input
+    if not timestamp or not signature.startswith("v0="):
+        return False
+
+    try:
+        timestamp_int = int(timestamp)
+    except ValueError:
+        return False
+
+    if abs(time.time() - timestamp_int) > 60 * 5:
         return False
 
-    body = await request.body()
-    sig_basestring = f"v0:{timestamp}:{body.decode()}"
-    my_signature = f"v0={hmac.new(settings.signing_secret.get_secret_value().encode(), sig_basestring.encode(), hashlib.sha256).hexdigest()}"
+    if body is None:
+        body = await request.body()
+    # sign the raw bytes directly rather than decoding/re-encoding the body
+    mac = _HMAC_TEMPLATE.copy()
+    mac.update(b"v0:" + timestamp.encode() + b":" + body)
 
-    verified = hmac.compare_digest(my_signature, signature)
+    verified = hmac.compare_digest(
+        b"v0=" + mac.hexdigest().encode(), signature.encode()
+    )
     logger.debug(f"Signature verification: {verified}")
     return verified
@@ -0,0 +1,45 @@
+"""Process-lifetime vectorstore handles.
+
+raggy's ``Chroma.collection`` is a property that calls
+``get_or_create_collection`` on every access, so caching the wrapper
+alone saves nothing. Each namespace gets one wrapper whose collection
+handle is resolved exactly once and reused for the life of the process.
+"""
+
+from functools import cached_property
+
+from chromadb import Collection
+from raggy.vectorstores.chroma import Chroma
+
+from .settings import settings
+
+
+class _CachedChroma(Chroma):
+    """Chroma that resolves its collection handle once per instance."""
+
+    @cached_property
+    def collection(self) -> Collection:
+        return super().collection
+
+
+_vectorstores: dict[str, Chroma] = {}
+
+
+def get_vectorstore(namespace: str | None = None) -> Chroma:
+    """Get the process-wide vectorstore for a namespace, opening it once."""
+    namespace = namespace or settings.namespace
+    if (vectorstore := _vectorstores.get(namespace)) is None:
+        vectorstore = _CachedChroma(
+            collection_name=namespace,
+            client_type=settings.chroma_client_type,
+        )
+        vectorstore.__enter__()
+        _vectorstores[namespace] = vectorstore
+    return vectorstore
+
+
+def close_vectorstores() -> None:
+    """Tear down open vectorstores; called from the FastAPI lifespan."""
+    while _vectorstores:
+        _, vectorstore = _vectorstores.popitem()
+        vectorstore.__exit__(None, None, None)
@@ -13,6 +13,18 @@ T = TypeVar("T")
 
 logger = get_logger(__name__)
 
+# patch_cls -> (patch_cls, *subclasses), refreshed only when the subclass
+# count changes so repeated context entries skip the reflective scan
+_SUBCLASS_CACHE: dict[type, tuple[type, ...]] = {}
+
+
+def _classes_to_patch(patch_cls: type) -> tuple[type, ...]:
+    classes = _SUBCLASS_CACHE.get(patch_cls)
+    if classes is None or len(classes) != 1 + len(patch_cls.__subclasses__()):
+        classes = tuple({patch_cls, *patch_cls.__subclasses__()})
+        _SUBCLASS_CACHE[patch_cls] = classes
+    return classes
+
 
 class DecorateMethodContext(ContextDecorator, Generic[T]):
     """Context decorator for patching methods with a decorator."""
@@ -36,7 +48,7 @@ class DecorateMethodContext(ContextDecorator, Generic[T]):
     def __enter__(self):
         """Called when entering the context manager."""
         self.patched_methods: list[tuple[type, str, Callable[..., T]]] = []
-        for cls in {self.patch_cls, *self.patch_cls.__subclasses__()}:
+        for cls in _classes_to_patch(self.patch_cls):
             self._patch_method(
                 cls=cls,
                 method_name=self.patch_method,
@@ -67,11 +79,14 @@ def prefect_wrapped_function(
     """Decorator for wrapping a function with a prefect decorator."""
     tags = tags or set()
 
+    # settings and func are fixed at patch time, so build the Task/Flow
+    # object once instead of on every tool invocation
+    wrapped_callable: Flow[..., Any] | Task[..., Any] = decorator(**settings or {})(
+        func
+    )
+
     @wraps(func)
     async def wrapper(*args: Any, **kwargs: Any) -> T:
-        wrapped_callable: Flow[..., Any] | Task[..., Any] = decorator(**settings or {})(
-            func
-        )
         with prefect_tags(*tags):
             logger.info(f"calling {wrapped_callable.name} with {args} and {kwargs}")
             result = wrapped_callable(*args, **kwargs)  # type: ignore